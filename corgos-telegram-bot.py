@@ -4,6 +4,12 @@ from sys import argv
 
 from modules.telegram import Telegram
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is not available on every platform, the default loop works too
+    uvloop = None
+
 
 def main(argv: list[str]):
     """Start main function, setups logger and starts the bot."""
@@ -11,6 +17,9 @@ def main(argv: list[str]):
 
     if "--debug" in argv:
         level = logging.DEBUG
+        # exception tracking hooks every allocation, so it is only
+        #   worth paying for while debugging
+        tracemalloc.start()
     else:
         level = logging.INFO
 
@@ -23,8 +32,9 @@ def main(argv: list[str]):
         ),
         filemode="w",
     )
-    # exception tracking
-    tracemalloc.start()
+    if uvloop is not None:
+        # the bot is all network I/O, so the libuv-based loop pays off
+        uvloop.install()
 
     t = Telegram()
     t.start()
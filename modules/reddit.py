@@ -1,351 +1,496 @@
-"""File containing the reddit interface to steal the images from reddit."""
-
-import asyncio
-import logging
-from random import shuffle
-
-import asyncpraw
-import ujson
-from asyncpraw.models import Submission
-import aiohttp
-
-
-class EmptyQueueException(Exception):
-    """Exception raised when the queue is empty."""
-
-    pass
-
-
-class Reddit:
-    """This class contains all the methods and variables needed to load the
-    urls of the pictures from reddit."""
-
-    _queue: list[str]
-    _temp_queue: list[str]
-    _queue_lock: asyncio.Lock
-    _temp_queue_lock: asyncio.Lock
-    _praw_requests_semaphore: asyncio.Semaphore
-    _http_requests_semaphore: asyncio.Semaphore
-    _reddit: asyncpraw.Reddit
-    _is_loading: bool = False
-
-    _settings: dict[str, str | int]
-    _settings_path: str = "settings.json"
-    _image_formats: tuple[str] = ("image/png", "image/jpeg")
-
-    def __init__(self) -> None:
-        """Initialize the Reddit interface."""
-        logging.info("Initializing Reddit interface")
-        # create the queues
-        self._queue = []
-        self._temp_queue = []
-
-        # load settings
-        self._loadSettings()
-
-        # create a semaphore for the reddit requests
-        self._praw_requests_semaphore = asyncio.Semaphore(
-            self._settings["concurrent_requests"]
-        )
-        # create a semaphore for the http requests
-        self._http_requests_semaphore = asyncio.Semaphore(
-            self._settings["concurrent_requests"]
-        )
-        # create a lock for the new queue
-        self._queue_lock = asyncio.Lock()
-        self._temp_queue_lock = asyncio.Lock()
-        logging.info("Reddit interface initialized")
-
-    # Private methods
-
-    def _loadSettings(self) -> None:
-        """Load settings from the settings file.
-
-        Unless differently specified during the instantiation,
-        the default settings path is used.
-        """
-        logging.debug("Loading settings")
-        with open(self._settings_path) as json_file:
-            # only keeps settings for Reddit, discarding others
-            self._settings = ujson.load(json_file)["Reddit"]
-        logging.debug("Settings loaded")
-
-    def _saveSettings(self) -> None:
-        """Save settings in the settings file.
-
-        Unless differently specified during the instantiation,
-        the default settings path is used.
-        """
-        logging.debug("Saving settings")
-        with open(self._settings_path) as json_file:
-            old_settings = ujson.load(json_file)
-
-        # since settings is a dictionary, we update the settings loaded
-        # with the current settings dict
-        old_settings["Reddit"].update(self._settings)
-
-        with open(self._settings_path, "w") as outfile:
-            ujson.dump(old_settings, outfile, indent=2)
-        logging.debug("Settings saved")
-
-    async def _asyncRequest(self, url: str) -> aiohttp.ClientResponse:
-        """Make an async request to the specified url.
-
-        Args:
-            url (str): url to be requested
-
-        Returns:
-            Response: response of the request
-        """
-        async with self._http_requests_semaphore:
-            logging.debug(f"Requesting url {url}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    logging.debug(f"Request to url {url} completed")
-                    return response
-
-    async def _scrapeGallery(self, media_metadata: dict) -> list[str]:
-        """Scrape a gallery of images.
-
-        Args:
-            url (str): url of the gallery
-        """
-        logging.debug("Scraping gallery")
-        urls = []
-        for media in media_metadata.items():
-            if len(media) < 2:
-                logging.debug("Media metadata is not valid, skipping")
-                continue
-
-            image_format = media[1].get("m", None)
-            if image_format is None:
-                logging.debug("Url is not an image, skipping")
-                continue
-
-            if image_format in self._image_formats:
-                logging.debug("Url is an image, adding to queue")
-                continue
-
-            image_obj = media[1].get("s", None)
-            if image_obj is None:
-                logging.debug("Url gallery does not contain this image, skipping")
-                continue
-
-            image_url = media[1]["s"].get("u", None)
-            if image_url is None:
-                logging.debug("Url is not an image, skipping")
-                continue
-
-            image_valid = await self._scrapeImage(image_url)
-            if image_valid is None:
-                logging.debug("Url is not an image, skipping")
-                continue
-
-            urls.append(image_url)
-
-        logging.debug(f"Found {len(urls)} images in gallery")
-        return urls
-
-    async def _scrapeImage(self, url: str) -> str:
-        """Load a single image, check if it's valid and add it to the queue.
-
-        Args:
-            url (str): url of the image
-        """
-        logging.debug(f"Checking url {url}")
-        try:
-            r = await self._asyncRequest(url)
-            image_format = r.headers["content-type"]
-            if image_format in self._image_formats:
-                logging.debug("Url is an image, adding to queue")
-                return url
-            else:
-                logging.debug(f"Url is not an image, skipping. Format: {image_format}")
-                return None
-        except Exception as e:
-            logging.error(f"Cannot open url {url}, error {e}")
-            return None
-
-    # Public methods
-
-    def login(self) -> None:
-        """Log into reddit.
-
-        User authentication details are loaded from settings file.
-        """
-        logging.info("Logging into Reddit")
-
-        self._reddit = asyncpraw.Reddit(
-            client_id=self._settings["client_id"],
-            client_secret=self._settings["client_secret"],
-            user_agent=self._settings["user_agent"],
-        )
-
-        logging.debug("Logged into Reddit")
-
-    async def _scrapePost(
-        self,
-        submission: Submission,
-    ) -> bool:
-        """Scrape a post from Reddit and add it to the temporary queue.
-
-        Args:
-            submission (Submission)
-
-        Returns:
-            bool: True if the post is valid, False otherwise
-        """
-        async with self._praw_requests_semaphore:
-            logging.info(f"Loading post with url {submission.url}")
-            # skip stickied posts
-            if submission.stickied:
-                logging.warning(f"Skipping post {submission.url} due to stickied")
-                return False
-            # skip selftext posts
-            if submission.is_self:
-                logging.warning(f"Skipping post {submission.url} due to selftext")
-                return False
-
-            # skip posts that have a low score
-            if submission.score < self._settings["min_score"]:
-                logging.warning(
-                    f"Skipping post {submission.url} due to low score "
-                    f"({submission.score}, min {self._settings['min_score']})"
-                )
-                return False
-
-            # filter gifs
-            if any(x in submission.url for x in [".gif", ".gifv", "v.redd.it"]):
-                logging.warning(f"Skipping post {submission.url} because is gif")
-                return False
-
-            logging.debug("Post passed all checks, loading")
-            await submission.load()
-
-            # try to open the image
-            scraped_urls = []
-            if hasattr(submission, "is_gallery"):
-                logging.debug("Post is a gallery, scraping")
-                scraped_urls = await self._scrapeGallery(submission.media_metadata)
-            else:
-                logging.debug("Post is not a gallery, scraping")
-                new_url = await self._scrapeImage(submission.url)
-                scraped_urls.append(new_url)
-
-            # check the url for each image
-            for url in scraped_urls:
-                # if it's a valid image, we add it to the queue
-                logging.debug(f"Adding {url} to list")
-                await self._temp_queue_lock.acquire()
-                self._temp_queue.append(url)
-                self._temp_queue_lock.release()
-                logging.info(f"Added {url} to list")
-
-            return True
-
-    async def loadPostsAsync(self) -> None:
-        """Load all image posts from the needed subreddit.
-
-        The links are shuffled and kept into memory.
-
-        Returns:
-            int: number of posts loaded
-        """
-        logging.info("Loading posts from Reddit")
-        # empty the queue
-        await self._temp_queue_lock.acquire()
-        self._temp_queue = []
-        self._is_loading = True
-        self._temp_queue_lock.release()
-
-        # load subreddits
-        subreddits = await self._reddit.subreddit("corgi+babycorgis")
-        # create a list of tasks to be executed
-        logging.debug("Creating tasks")
-        tasks = {
-            self._scrapePost(submission)
-            async for submission in subreddits.top(
-                "week", limit=self._settings["post_limit"]
-            )
-        }
-        logging.debug("Executing tasks")
-        # execute all the tasks and wait for them to finish
-        await asyncio.gather(*tasks)
-
-        # shuffle the queue and empty the temporary queue
-        await self._queue_lock.acquire()
-        await self._temp_queue_lock.acquire()
-        self._queue = self._temp_queue.copy()
-        shuffle(self._queue)
-        self._temp_queue = []
-        self._is_loading = False
-        self._temp_queue_lock.release()
-        self._queue_lock.release()
-
-        # return the number of posts loaded
-        logging.info(f"Loaded {len(self._queue)} posts from Reddit")
-        return len(self._queue)
-
-    async def getUrl(self) -> str:
-        """Return the url of the next image in the queue."""
-        # if somehow we did not load anything, we throw an exception
-        # this should likely never happen, but might be triggered if the queue
-        # has not been loaded yet
-        logging.info("Getting next image from queue")
-        queue_size = await self.getQueueSize()
-        if queue_size == 0:
-            logging.warning("Queue is empty. Trying temporary queue")
-            raise EmptyQueueException
-
-        url = await self._rotateQueue()
-        logging.info(f"Next image is {url}")
-        return url
-
-    async def removeUrl(self, url: str) -> None:
-        """Remove an url from the queue.
-
-        Args:
-            url (str): url to be removed
-        """
-        logging.debug(f"Removing url {url} from queue")
-        await self._queue_lock.acquire()
-        self._queue.remove(url)
-        self._queue_lock.release()
-
-    async def _rotateQueue(self) -> str:
-        """Rotate the queue and return the next url.
-
-        Returns:
-            str: next url
-        """
-        logging.debug("Rotating queue")
-        await self._queue_lock.acquire()
-        url = self._queue[0]
-        self._queue.append(self._queue.pop(0))
-        self._queue_lock.release()
-        return url
-
-    async def getTempQueueSize(self) -> int:
-        """Return the size of the temporary queue."""
-        logging.debug("Getting temporary queue size")
-        await self._temp_queue_lock.acquire()
-        size = len(self._temp_queue)
-        self._temp_queue_lock.release()
-
-        logging.debug(f"Temporary queue size is {size}")
-        return size
-
-    async def getQueueSize(self) -> int:
-        """Return the size of the queue."""
-        logging.debug("Getting queue size")
-        await self._queue_lock.acquire()
-        size = len(self._queue)
-        self._queue_lock.release()
-
-        logging.debug(f"Queue size is {size}")
-        return size
-
-    @property
-    def is_loading(self) -> bool:
-        """Return True if the queue is being loaded, False otherwise."""
-        return self._is_loading
+"""File containing the reddit interface to steal the images from reddit."""
+
+import asyncio
+import logging
+import os
+import re
+from random import shuffle
+from time import time
+from urllib.parse import urlparse
+
+import asyncpraw
+import orjson
+from asyncpraw.models import Submission
+import aiohttp
+
+
+class EmptyQueueException(Exception):
+    """Exception raised when the queue is empty."""
+
+    pass
+
+
+class Reddit:
+    """This class contains all the methods and variables needed to load the
+    urls of the pictures from reddit."""
+
+    _queue: dict[str, None]
+    _temp_queue: list[str]
+    _seen_urls: set[str]
+    _content_type_cache: dict[str, str]
+    _queue_lock: asyncio.Lock
+    _queue_ready: asyncio.Event
+    _reddit: asyncpraw.Reddit
+    _http_session: aiohttp.ClientSession | None = None
+    _is_loading: bool = False
+
+    _settings: dict[str, str | int]
+    _full_settings: dict[str, dict]
+    _settings_path: str = "settings.json"
+    _queue_cache_path: str = "queue.json"
+    # a cached queue older than this (seconds) is considered stale
+    _queue_cache_ttl: int = 60 * 60 * 24
+    _image_formats: frozenset[str] = frozenset(("image/png", "image/jpeg"))
+    # classifies a url path whose content type is already obvious from
+    #   its extension, so accept and reject are decided in a single scan
+    #   without a network round-trip
+    _url_class_re: re.Pattern = re.compile(
+        r"(?P<image>\.(?:jpe?g|png)$)|(?P<video>\.(?:gifv?|mp4|webm|mov)$)"
+    )
+    # single-pass matcher for urls that are certainly gifs or videos
+    _gif_reject_re: re.Pattern = re.compile(r"\.gifv?|v\.redd\.it")
+
+    def __init__(self) -> None:
+        """Initialize the Reddit interface."""
+        logging.info("Initializing Reddit interface")
+        # create the queues; the main one is a dict used as an ordered
+        #   set, so rotation and removal are both O(1)
+        self._queue = {}
+        self._temp_queue = []
+        # urls already handled in the current load, to skip duplicates
+        #   coming from cross-posts and repeated top posts
+        self._seen_urls = set()
+        # content types fetched in previous loads: "top of the week"
+        #   repeats most submissions between consecutive runs, so the
+        #   cache spares those urls a second network check
+        self._content_type_cache = {}
+
+        # load settings
+        self._loadSettings()
+        # restore the queue saved by the previous run, if fresh enough,
+        #   so the bot can serve corgos while the full reload runs
+        self._loadQueueCache()
+
+        # create a lock for the new queue
+        self._queue_lock = asyncio.Lock()
+        # set whenever the queue holds at least one url, so callers can
+        #   briefly wait for a refill instead of giving up immediately
+        self._queue_ready = asyncio.Event()
+        if self._queue:
+            self._queue_ready.set()
+        logging.info("Reddit interface initialized")
+
+    # Private methods
+
+    def _loadSettings(self) -> None:
+        """Load settings from the settings file.
+
+        Unless differently specified during the instantiation,
+        the default settings path is used.
+        """
+        logging.debug("Loading settings")
+        with open(self._settings_path, "rb") as json_file:
+            self._full_settings = orjson.loads(json_file.read())
+
+        # keep a shared reference to the Reddit section, so saves can
+        #   dump the cached full dict without re-reading the file
+        self._settings = self._full_settings["Reddit"]
+        logging.debug("Settings loaded")
+
+    def _saveSettings(self) -> None:
+        """Save settings in the settings file.
+
+        Unless differently specified during the instantiation,
+        the default settings path is used.
+        """
+        logging.debug("Saving settings")
+        # self._settings is a reference into the cached full dict, so the
+        # current values are already there and no re-read is needed;
+        # writing to a temporary file and swapping it in keeps the save
+        # atomic even if the process dies mid-write
+        temp_path = self._settings_path + ".tmp"
+        with open(temp_path, "wb") as outfile:
+            outfile.write(
+                orjson.dumps(self._full_settings, option=orjson.OPT_INDENT_2)
+            )
+        os.replace(temp_path, self._settings_path)
+        logging.debug("Settings saved")
+
+    def _loadQueueCache(self) -> None:
+        """Restore the url queue from the cache file, if it is fresh enough."""
+        if not os.path.isfile(self._queue_cache_path):
+            return
+
+        if time() - os.path.getmtime(self._queue_cache_path) > self._queue_cache_ttl:
+            logging.info("Queue cache is stale, skipping")
+            return
+
+        with open(self._queue_cache_path, "rb") as cache_file:
+            self._queue = dict.fromkeys(orjson.loads(cache_file.read()))
+        logging.info(f"Restored {len(self._queue)} urls from queue cache")
+
+    def _getHttpSession(self) -> aiohttp.ClientSession:
+        """Return the shared http session, creating it if needed.
+
+        The session is created lazily (so it binds to the running event
+        loop) and reused across all requests: this way the TCP and TLS
+        handshakes are paid once per host instead of once per url.
+        """
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._settings["concurrent_requests"],
+                    keepalive_timeout=30,
+                    ttl_dns_cache=300,
+                )
+            )
+        return self._http_session
+
+    async def _fetchHeaders(self, url: str) -> dict[str, str]:
+        """Fetch the response headers for the specified url.
+
+        The headers are copied out while the request context is still
+        open, so no released ClientResponse ever leaks to the callers.
+        Keys are lowercased, as plain dicts are case sensitive.
+
+        Args:
+            url (str): url to be requested
+
+        Returns:
+            dict[str, str]: response headers
+        """
+        logging.debug(f"Requesting url {url}")
+        session = self._getHttpSession()
+        # only the headers are ever inspected, so HEAD keeps the image
+        #   body off the wire entirely
+        async with session.head(url, allow_redirects=True) as response:
+            if response.status != 405:
+                logging.debug(f"Request to url {url} completed")
+                return {k.lower(): v for k, v in response.headers.items()}
+
+        # some hosts reject HEAD; a ranged GET moves a single byte instead
+        async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+            logging.debug(f"Request to url {url} completed")
+            return {k.lower(): v for k, v in response.headers.items()}
+
+    async def _scrapeGallery(self, media_metadata: dict) -> list[str]:
+        """Scrape a gallery of images.
+
+        Args:
+            url (str): url of the gallery
+        """
+        logging.debug("Scraping gallery")
+        # walk the metadata first (no awaits), collecting candidate urls
+        candidates = []
+        for media in media_metadata.items():
+            if len(media) < 2:
+                logging.debug("Media metadata is not valid, skipping")
+                continue
+
+            image_format = media[1].get("m", None)
+            if image_format is None:
+                logging.debug("Url is not an image, skipping")
+                continue
+
+            if image_format not in self._image_formats:
+                logging.debug("Url is not an image, skipping")
+                continue
+
+            image_obj = media[1].get("s", None)
+            if image_obj is None:
+                logging.debug("Url gallery does not contain this image, skipping")
+                continue
+
+            image_url = media[1]["s"].get("u", None)
+            if image_url is None:
+                logging.debug("Url is not an image, skipping")
+                continue
+
+            candidates.append(image_url)
+
+        # then validate all the candidates concurrently, so a 20-image
+        #   gallery costs one round-trip instead of twenty
+        results = await asyncio.gather(
+            *(self._scrapeImage(url) for url in candidates)
+        )
+        urls = [url for url in results if url is not None]
+
+        logging.debug(f"Found {len(urls)} images in gallery")
+        return urls
+
+    async def _scrapeImage(self, url: str) -> str:
+        """Load a single image, check if it's valid and add it to the queue.
+
+        Args:
+            url (str): url of the image
+        """
+        logging.debug(f"Checking url {url}")
+        # a duplicate url was already validated (or rejected) this load,
+        #   and must not be queued twice anyway
+        if url in self._seen_urls:
+            logging.debug("Url already seen this load, skipping")
+            return None
+        self._seen_urls.add(url)
+
+        # a known extension settles the check without touching the network
+        url_class = self._url_class_re.search(urlparse(url).path.lower())
+        if url_class is not None:
+            if url_class.lastgroup == "image":
+                logging.debug("Url has a known image extension, adding to queue")
+                return url
+            logging.debug("Url has a known non-image extension, skipping")
+            return None
+
+        image_format = self._content_type_cache.get(url)
+        if image_format is None:
+            try:
+                headers = await self._fetchHeaders(url)
+                image_format = headers["content-type"]
+            except Exception as e:
+                logging.error(f"Cannot open url {url}, error {e}")
+                return None
+            self._content_type_cache[url] = image_format
+
+        if image_format in self._image_formats:
+            logging.debug("Url is an image, adding to queue")
+            return url
+
+        logging.debug(f"Url is not an image, skipping. Format: {image_format}")
+        return None
+
+    # Public methods
+
+    def login(self) -> None:
+        """Log into reddit.
+
+        User authentication details are loaded from settings file.
+        """
+        logging.info("Logging into Reddit")
+
+        self._reddit = asyncpraw.Reddit(
+            client_id=self._settings["client_id"],
+            client_secret=self._settings["client_secret"],
+            user_agent=self._settings["user_agent"],
+        )
+
+        logging.debug("Logged into Reddit")
+
+    async def close(self) -> None:
+        """Close the shared http session, if it was ever created."""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+
+    def saveQueue(self) -> None:
+        """Save the url queue to the cache file.
+
+        Meant to be called on shutdown, so the next run can skip the
+        cold-start scrape.
+        """
+        with open(self._queue_cache_path, "wb") as cache_file:
+            cache_file.write(orjson.dumps(list(self._queue)))
+        logging.info(f"Saved {len(self._queue)} urls to queue cache")
+
+    async def _scrapePost(
+        self,
+        submission: Submission,
+    ) -> list[str]:
+        """Scrape a post from Reddit and return its valid image urls.
+
+        Args:
+            submission (Submission)
+
+        Returns:
+            list[str]: urls of the valid images, empty if the post is skipped
+        """
+        logging.info(f"Loading post with url {submission.url}")
+        # skip stickied posts
+        if submission.stickied:
+            logging.warning(f"Skipping post {submission.url} due to stickied")
+            return []
+        # skip selftext posts
+        if submission.is_self:
+            logging.warning(f"Skipping post {submission.url} due to selftext")
+            return []
+
+        # skip posts that have a low score
+        if submission.score < self._settings["min_score"]:
+            logging.warning(
+                f"Skipping post {submission.url} due to low score "
+                f"({submission.score}, min {self._settings['min_score']})"
+            )
+            return []
+
+        # filter gifs
+        if self._gif_reject_re.search(submission.url):
+            logging.warning(f"Skipping post {submission.url} because is gif")
+            return []
+
+        logging.debug("Post passed all checks")
+        # the listing already carries most fields, so the extra API
+        #   round-trip is only needed for galleries missing their metadata
+        if hasattr(submission, "is_gallery") and not hasattr(
+            submission, "media_metadata"
+        ):
+            logging.debug("Gallery metadata is missing, loading post")
+            await submission.load()
+
+        # try to open the image
+        scraped_urls = []
+        if hasattr(submission, "is_gallery"):
+            logging.debug("Post is a gallery, scraping")
+            scraped_urls = await self._scrapeGallery(submission.media_metadata)
+        else:
+            logging.debug("Post is not a gallery, scraping")
+            new_url = await self._scrapeImage(submission.url)
+            if new_url is not None:
+                scraped_urls.append(new_url)
+
+        logging.info(f"Found {len(scraped_urls)} valid urls in post")
+        return scraped_urls
+
+    async def loadPostsAsync(self) -> None:
+        """Load all image posts from the needed subreddit.
+
+        The links are shuffled and kept into memory.
+
+        Returns:
+            int: number of posts loaded
+        """
+        logging.info("Loading posts from Reddit")
+        # empty the queue
+        self._temp_queue = []
+        self._seen_urls = set()
+        self._is_loading = True
+
+        # load subreddits
+        subreddits = await self._reddit.subreddit("corgi+babycorgis")
+
+        # scrape posts as soon as the listing yields them, instead of
+        #   waiting for the whole pagination before fanning out: the
+        #   producer feeds a bounded queue drained by a pool of workers
+        workers_count = self._settings["concurrent_requests"]
+        submissions = asyncio.Queue(maxsize=2 * workers_count)
+
+        async def producer() -> None:
+            async for submission in subreddits.top(
+                "week", limit=self._settings["post_limit"]
+            ):
+                await submissions.put(submission)
+            # one sentinel per worker, so they all shut down
+            for _ in range(workers_count):
+                await submissions.put(None)
+
+        async def worker() -> None:
+            while True:
+                submission = await submissions.get()
+                if submission is None:
+                    break
+                # each post returns its own url list, so no lock guards
+                #   the shared aggregation
+                self._temp_queue.extend(await self._scrapePost(submission))
+
+        logging.debug("Scraping posts")
+        await asyncio.gather(producer(), *(worker() for _ in range(workers_count)))
+
+        # build the new queue outside the lock, so concurrent getters are
+        #   only ever blocked for the reference swap below; dicts preserve
+        #   insertion order, keeping the random serving order
+        shuffle(self._temp_queue)
+        new_queue = dict.fromkeys(self._temp_queue)
+        self._temp_queue = []
+
+        # swap in the new queue
+        await self._queue_lock.acquire()
+        self._queue = new_queue
+        self._is_loading = False
+        self._queue_lock.release()
+
+        if self._queue:
+            self._queue_ready.set()
+        else:
+            self._queue_ready.clear()
+
+        # return the number of posts loaded
+        logging.info(f"Loaded {len(self._queue)} posts from Reddit")
+        return len(self._queue)
+
+    async def getUrl(self) -> str:
+        """Return the url of the next image in the queue."""
+        # if somehow we did not load anything, we throw an exception
+        # this should likely never happen, but might be triggered if the queue
+        # has not been loaded yet
+        logging.info("Getting next image from queue")
+        queue_size = await self.getQueueSize()
+        if queue_size == 0:
+            logging.warning("Queue is empty. Trying temporary queue")
+            raise EmptyQueueException
+
+        url = await self._rotateQueue()
+        logging.info(f"Next image is {url}")
+        return url
+
+    async def removeUrl(self, url: str) -> None:
+        """Remove an url from the queue.
+
+        Args:
+            url (str): url to be removed
+        """
+        logging.debug(f"Removing url {url} from queue")
+        await self._queue_lock.acquire()
+        self._queue.pop(url, None)
+        if not self._queue:
+            self._queue_ready.clear()
+        self._queue_lock.release()
+
+    async def _rotateQueue(self) -> str:
+        """Rotate the queue and return the next url.
+
+        Returns:
+            str: next url
+        """
+        logging.debug("Rotating queue")
+        await self._queue_lock.acquire()
+        # pop the oldest url and re-insert it at the back: both ends of
+        #   the dict are O(1) to touch
+        url = next(iter(self._queue))
+        del self._queue[url]
+        self._queue[url] = None
+        self._queue_lock.release()
+        return url
+
+    async def waitForUrls(self, timeout: float) -> bool:
+        """Wait until the queue holds at least one url.
+
+        Args:
+            timeout (float): maximum time to wait, in seconds
+
+        Returns:
+            bool: True if an url became available in time
+        """
+        try:
+            await asyncio.wait_for(self._queue_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def getTempQueueSize(self) -> int:
+        """Return the size of the temporary queue."""
+        logging.debug("Getting temporary queue size")
+        size = len(self._temp_queue)
+        logging.debug(f"Temporary queue size is {size}")
+        return size
+
+    async def getQueueSize(self) -> int:
+        """Return the size of the queue."""
+        logging.debug("Getting queue size")
+        await self._queue_lock.acquire()
+        size = len(self._queue)
+        self._queue_lock.release()
+
+        logging.debug(f"Queue size is {size}")
+        return size
+
+    @property
+    def is_loading(self) -> bool:
+        """Return True if the queue is being loaded, False otherwise."""
+        return self._is_loading